@@ -10,25 +10,51 @@ central FastAPI endpoints.
 """
 
 import asyncio
+import contextlib
 import glob
-import json
+import io
+import itertools
 import logging
+import multiprocessing
 import os
 import secrets
 import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from logging.handlers import SysLogHandler
+from multiprocessing import shared_memory
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 import cv2
 import numpy as np
+import orjson
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import FileResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from pydantic import BaseModel, Field
 
+try:  # Optional libjpeg-turbo binding; falls back to OpenCV when unavailable.
+    import simplejpeg
+except ImportError:  # pragma: no cover - depends on the runtime image
+    simplejpeg = None
+
+try:  # PyTurboJPEG, e.g. Raspberry Pi OS's python3-turbojpeg package.
+    from turbojpeg import TJFLAG_FASTDCT, TJPF_BGR, TurboJPEG
+
+    _TURBOJPEG = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # pragma: no cover - module or libturbojpeg missing
+    _TURBOJPEG = None
+
+try:  # Raspberry Pi CSI camera stack, only needed for source="picamera2".
+    from picamera2 import Picamera2
+    from picamera2.encoders import MJPEGEncoder
+    from picamera2.outputs import FileOutput
+except ImportError:  # pragma: no cover - only present on Raspberry Pi OS
+    Picamera2 = None
+
 CONFIG_PATH = Path("cameras.json")
 NGINX_CONFIG_PATH = Path("nginx.cameras.conf")
 DEFAULT_CAMERA_HOST = "0.0.0.0"
@@ -40,10 +66,44 @@ LOG_FILE = os.getenv("LOG_FILE")
 MAX_DEVICE_PROBE = int(os.getenv("MAX_DEVICE_PROBE", "4"))
 PROBE_WHEN_NO_DEVICES = os.getenv("PROBE_WHEN_NO_DEVICES", "false").lower() == "true"
 CAMERA_RETRY_INTERVAL = float(os.getenv("CAMERA_RETRY_INTERVAL", "30"))
+ENCODE_WORKERS = int(os.getenv("ENCODE_WORKERS", "0"))
+ENCODE_RING_SLOTS = 4
+CAMERA_SOURCES = ("opencv", "picamera2")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+# Snapshot files stay on disk for this many recent frames, and this many
+# seconds after their camera stops, so responses that already looked one up
+# can still open it.
+SNAPSHOT_FILES_KEPT = 2
+SNAPSHOT_FILE_GRACE = 2.0
+MJPEG_BOUNDARY = "frame"
+MJPEG_MEDIA_TYPE = f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}"
+# Live streams must not be cached or held back by a buffering proxy.
+MJPEG_HEADERS = {"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+# Filled in with bytes %-formatting, so no str round-trip per frame.
+MJPEG_PART_HEADER = f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n".encode()
+MJPEG_PART_END = b"\r\n"
 
 logger = logging.getLogger("rpicamserver")
 security = HTTPBasic(auto_error=False)
+# Replaced wholesale on every change (never mutated in place), so readers
+# can take one reference and see a consistent set of camera states.
 CAMERA_STATUS: Dict[str, Dict[str, Any]] = {}
+STATUS_WRITE_LOCK = threading.Lock()
+# Built /health and /metrics payloads with their build time; reused for
+# STATUS_CACHE_TTL seconds or until a camera changes state.
+STATUS_CACHE: Dict[str, tuple[float, Any]] = {}
+STATUS_CACHE_TTL = 1.0
+
+
+def _set_status(cam_id: str, state: str, message: str, device: Any) -> None:
+    _publish_status({cam_id: {"state": state, "message": message, "device": device}})
+
+
+def _publish_status(updates: Dict[str, Dict[str, Any]], replace: bool = False) -> None:
+    global CAMERA_STATUS
+    with STATUS_WRITE_LOCK:
+        CAMERA_STATUS = dict(updates) if replace else {**CAMERA_STATUS, **updates}
+    invalidate_status_cache()
 
 
 class SafeSysLogHandler(SysLogHandler):
@@ -110,6 +170,90 @@ app = FastAPI(title="Raspberry Pi Camera Server")
 ###############################################################################
 
 
+class _JpegSink(io.BufferedIOBase):
+    """File-like target for picamera2's encoder that keeps only the newest JPEG."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cond = threading.Condition()
+        self.frame: Optional[bytes] = None
+        self.seq = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, buf) -> int:  # type: ignore[override]
+        with self.cond:
+            self.frame = bytes(buf)
+            self.seq += 1
+            self.cond.notify_all()
+        return len(buf)
+
+
+class PiCameraSource:
+    """VideoCapture-style reader for CSI cameras that encodes MJPEG on the Pi's ISP.
+
+    ``read()`` returns each hardware-encoded JPEG as a flat uint8 array, the same
+    shape OpenCV produces for MJPEG passthrough, so ``Camera`` serves it as-is.
+    OpenCV property controls are not mapped onto libcamera controls.
+    """
+
+    def __init__(
+        self,
+        camera_num: int,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fps: Optional[float] = None,
+    ) -> None:
+        if Picamera2 is None:
+            raise RuntimeError("picamera2 is not installed; it is required for source 'picamera2'")
+
+        self._sink = _JpegSink()
+        self._read_seq = 0
+        self._picam = Picamera2(camera_num)
+        try:
+            main = {"size": (int(width), int(height))} if width and height else {}
+            controls = {"FrameRate": float(fps)} if fps else {}
+            self._picam.configure(self._picam.create_video_configuration(main=main, controls=controls))
+            self._picam.start_recording(MJPEGEncoder(), FileOutput(self._sink))
+        except Exception:
+            # Free the sensor, or every restart attempt would find it busy.
+            self._picam.close()
+            raise
+        self._opened = True
+
+    def isOpened(self) -> bool:  # noqa: N802 - mirrors cv2.VideoCapture
+        return self._opened
+
+    def read(self):
+        with self._sink.cond:
+            ready = self._sink.cond.wait_for(
+                lambda: self._sink.seq != self._read_seq or not self._opened, timeout=2.0
+            )
+            if not ready or not self._opened:
+                return False, None
+            self._read_seq = self._sink.seq
+            frame = self._sink.frame
+        return True, np.frombuffer(frame, dtype=np.uint8)
+
+    def set(self, _prop_id, _value) -> bool:
+        return False
+
+    def get(self, _prop_id) -> float:
+        return 0.0
+
+    def release(self) -> None:
+        if not self._opened:
+            return
+        self._opened = False
+        with self._sink.cond:
+            self._sink.cond.notify_all()
+        try:
+            self._picam.stop_recording()
+        finally:
+            self._picam.close()
+
+
 class Camera:
     """Background frame grabber for a single video device."""
 
@@ -123,6 +267,8 @@ class Camera:
         brightness: Optional[float] = None,
         exposure: Optional[float] = None,
         white_balance: Optional[float] = None,
+        mjpeg_passthrough: bool = False,
+        source: str = "opencv",
     ) -> None:
         self.cam_id = cam_id
         self.device_index = device_index
@@ -132,10 +278,22 @@ class Camera:
         self.brightness = brightness
         self.exposure = exposure
         self.white_balance = white_balance
+        # Ask the device for MJPEG and keep its JPEG frames as-is (no decode/encode).
+        self.mjpeg_passthrough = mjpeg_passthrough
+        self.source = source
+        # Both passthrough and picamera2 captures yield JPEG bytes instead of BGR frames.
+        self.jpeg_frames = mjpeg_passthrough or source == "picamera2"
         self.capture_interval = 1 / float(fps or 30.0)
         self.idle_wait = 5.0
-        self.active_subscribers = 0
-        self.subscriber_lock = threading.Lock()
+        # Guards frame publication as well as the viewer registry below.
+        self.frame_cond = threading.Condition()
+        # Viewer token -> event loop serving it; the count of viewers is its length.
+        self.subscribers: Dict[int, asyncio.AbstractEventLoop] = {}
+        self._subscriber_tokens = itertools.count()
+        # Latest multipart stream part as (frame_seq, part); viewers wait on the
+        # condition of their own event loop for the sequence number to advance.
+        self.stream_part: tuple[int, Optional[bytes]] = (0, None)
+        self.stream_conds: Dict[asyncio.AbstractEventLoop, asyncio.Condition] = {}
         self.idle_event = threading.Event()
         self.last_frame_ts = 0.0
         self.failure_count = 0
@@ -143,40 +301,63 @@ class Camera:
 
         try:
             self.cap = self._open_capture()
-            CAMERA_STATUS[self.cam_id] = {
-                "state": "online",
-                "message": "running",
-                "device": self.device_index,
-            }
+            _set_status(self.cam_id, "online", "running", self.device_index)
         except Exception as exc:  # noqa: BLE001
             self.cap = None
             self.next_retry_ts = time.time() + CAMERA_RETRY_INTERVAL
-            CAMERA_STATUS[self.cam_id] = {
-                "state": "offline",
-                "message": str(exc),
-                "device": self.device_index,
-            }
+            _set_status(self.cam_id, "offline", str(exc), self.device_index)
             logger.error("Failed to start camera %s: %s", self.cam_id, exc)
 
-        self.frame_lock = threading.Lock()
         self.latest_frame = None
+        self.frame_seq = 0
+        # Distinguishes ETags from earlier Camera instances whose counters also started at 0.
+        self.etag_prefix = secrets.token_hex(4)
+        # ETags of the frames stored under SNAPSHOT_DIR, oldest first.
+        self._snapshot_etags: List[str] = []
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_cleanup: Optional[threading.Timer] = None
+        self.encode_lock = threading.Lock()
+        self.latest_jpeg: Optional[bytes] = None
+        self.latest_jpeg_quality: Optional[int] = None
+        self._jpeg_source = None
+        # Shared-memory frame slots handed to encode worker processes.
+        self._ring: Optional[shared_memory.SharedMemory] = None
+        self._ring_slot_size = 0
+        self._ring_free = list(range(ENCODE_RING_SLOTS))
+        self._ring_lock = threading.Lock()
+        self._ring_slots = threading.BoundedSemaphore(ENCODE_RING_SLOTS)
         self.running = True
 
         self.thread = threading.Thread(target=self._update_loop, daemon=True)
         self.thread.start()
 
     def _open_capture(self) -> cv2.VideoCapture:
-        cap = cv2.VideoCapture(self.device_index)
+        if self.source == "picamera2":
+            return PiCameraSource(self.device_index, self.width, self.height, self.fps)
+
+        if self.mjpeg_passthrough:
+            cap = cv2.VideoCapture(self.device_index, cv2.CAP_V4L2)
+        else:
+            cap = cv2.VideoCapture(self.device_index)
         if not cap.isOpened():
             cap.release()
             raise RuntimeError(f"Could not open camera device {self.device_index}")
 
+        if self.mjpeg_passthrough:
+            # Request compressed frames before sizing; with RGB conversion off,
+            # read() returns the device's JPEG bytes as a flat uint8 array.
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
         if self.width:
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, int(self.width))
         if self.height:
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(self.height))
         if self.fps:
             cap.set(cv2.CAP_PROP_FPS, float(self.fps))
+        if hasattr(cv2, "CAP_PROP_BUFFERSIZE"):
+            # Keep only the newest frame queued so reads never return stale data.
+            cap.set(getattr(cv2, "CAP_PROP_BUFFERSIZE"), 1)
         if self.brightness is not None and hasattr(cv2, "CAP_PROP_BRIGHTNESS"):
             cap.set(getattr(cv2, "CAP_PROP_BRIGHTNESS"), float(self.brightness))
         if self.exposure is not None and hasattr(cv2, "CAP_PROP_EXPOSURE"):
@@ -185,25 +366,62 @@ class Camera:
             cap.set(getattr(cv2, "CAP_PROP_WB_TEMPERATURE"), float(self.white_balance))
         return cap
 
-    def add_subscriber(self) -> None:
-        with self.subscriber_lock:
-            self.active_subscribers += 1
+    @contextlib.asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Condition]:
+        """Register a stream viewer and yield the condition notified on new frames."""
+
+        loop = asyncio.get_running_loop()
+        token = next(self._subscriber_tokens)
+        with self.frame_cond:
+            cond = self.stream_conds.get(loop)
+            if cond is None:
+                cond = self.stream_conds[loop] = asyncio.Condition()
+            self.subscribers[token] = loop
         self.idle_event.set()
+        try:
+            yield cond
+        finally:
+            with self.frame_cond:
+                del self.subscribers[token]
+                if loop not in self.subscribers.values():
+                    del self.stream_conds[loop]
+                idle = not self.subscribers
+            if idle:
+                self.idle_event.set()
+
+    async def next_part(self, cond: asyncio.Condition, last_seq: int, timeout: float) -> Optional[tuple[int, bytes]]:
+        """Wait for a stream part newer than ``last_seq``; None if none arrives in time."""
+
+        async with cond:
+            try:
+                await asyncio.wait_for(cond.wait_for(lambda: self.stream_part[0] > last_seq), timeout)
+            except TimeoutError:
+                return None
+            return self.stream_part  # type: ignore[return-value]
 
-    def remove_subscriber(self) -> None:
-        with self.subscriber_lock:
-            self.active_subscribers = max(0, self.active_subscribers - 1)
-            zero = self.active_subscribers == 0
-        if zero:
-            self.idle_event.set()
+    def _publish_jpeg(self, seq: int, jpg_bytes: bytes) -> None:
+        # Frame the part here, once per frame, instead of once per viewer.
+        self.stream_part = (seq, _pack_mjpeg_part(jpg_bytes))
+        with self.frame_cond:
+            conds = list(self.stream_conds.items())
+
+        for loop, cond in conds:
+            if loop.is_closed():
+                # The viewer's event loop has already shut down.
+                continue
+            notify = _notify_viewers(cond)
+            try:
+                asyncio.run_coroutine_threadsafe(notify, loop)
+            except RuntimeError:
+                # The loop closed after the check; drop the unscheduled coroutine.
+                notify.close()
 
     def request_restart(self) -> None:
         self.next_retry_ts = 0
         self.idle_event.set()
 
     def _subscriber_count(self) -> int:
-        with self.subscriber_lock:
-            return self.active_subscribers
+        return len(self.subscribers)
 
     def _restart_capture(self) -> None:
         if time.time() < self.next_retry_ts:
@@ -220,20 +438,12 @@ class Camera:
             self.failure_count = 0
             self.idle_event.set()
             self.next_retry_ts = time.time()
-            CAMERA_STATUS[self.cam_id] = {
-                "state": "online",
-                "message": "running",
-                "device": self.device_index,
-            }
+            _set_status(self.cam_id, "online", "running", self.device_index)
             logger.info("Restarted camera device %s", self.device_index)
         except Exception as exc:  # noqa: BLE001
             self.cap = None
             self.next_retry_ts = time.time() + CAMERA_RETRY_INTERVAL
-            CAMERA_STATUS[self.cam_id] = {
-                "state": "offline",
-                "message": str(exc),
-                "device": self.device_index,
-            }
+            _set_status(self.cam_id, "offline", str(exc), self.device_index)
             logger.error("Failed to restart camera %s: %s", self.device_index, exc)
 
     def _update_loop(self) -> None:
@@ -249,6 +459,7 @@ class Camera:
                 self.idle_event.wait(timeout=self.idle_wait)
                 # continue to read once to keep snapshots fresh when prompted
 
+            read_started = time.monotonic()
             ret, frame = self.cap.read()
             if not ret:
                 self.failure_count += 1
@@ -258,34 +469,169 @@ class Camera:
                 continue
 
             self.failure_count = 0
-            with self.frame_lock:
-                self.latest_frame = frame
-                self.last_frame_ts = time.time()
-            CAMERA_STATUS[self.cam_id] = {
-                "state": "online",
-                "message": "running",
-                "device": self.device_index,
-                "last_frame_ts": self.last_frame_ts,
-                "subscribers": self._subscriber_count(),
-            }
+            self._publish_frame(frame)
+            if self._subscriber_count() > 0:
+                # Encode once here so every viewer of this frame shares the bytes.
+                seq = self.frame_seq
+                jpg_bytes = self.get_frame_jpeg()
+                if jpg_bytes is not None:
+                    self._publish_jpeg(seq, jpg_bytes)
+
+            # V4L2 reads block until the next frame, so this only paces backends
+            # that return immediately instead of adding a fixed delay per frame.
+            remaining = self.capture_interval - (time.monotonic() - read_started)
+            if remaining > 0.002:
+                time.sleep(remaining)
+
+    def _publish_frame(self, frame) -> None:
+        # Readers share this buffer instead of copying it; cap.read() hands
+        # back a fresh array per frame so it is never written to again.
+        frame.setflags(write=False)
+        # Readers that do not wait load the reference without locking; the
+        # condition only wakes threads blocked in get_frame(wait=True).
+        with self.frame_cond:
+            self.latest_frame = frame
+            self.last_frame_ts = time.time()
+            self.frame_seq += 1
+            self.frame_cond.notify_all()
+
+    def frame_etag(self, frame=None) -> Optional[str]:
+        """Return the ETag of the latest frame, or of ``frame`` if it is still the latest."""
+
+        with self.frame_cond:
+            if self.latest_frame is None or (frame is not None and frame is not self.latest_frame):
+                return None
+            return f'"{self.etag_prefix}-{self.frame_seq}"'
 
-            time.sleep(self.capture_interval)
+    def _snapshot_path(self, etag: str) -> Path:
+        # One file per frame, named by our own ETag rather than cam_id so
+        # user-supplied ids never form paths. A file is never rewritten once
+        # it is in place, so its size always matches its frame.
+        frame_tag = etag.strip('"')
+        return Path(SNAPSHOT_DIR) / f"snapshot-{frame_tag}.jpg"
+
+    def snapshot_file(self, etag: str) -> Optional[tuple[Path, os.stat_result]]:
+        """Return the stored file for the frame tagged ``etag`` and its stat, if present."""
+
+        with self._snapshot_lock:
+            if etag not in self._snapshot_etags:
+                return None
+        path = self._snapshot_path(etag)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            return path, os.fstat(fd)
+        finally:
+            os.close(fd)
+
+    def store_snapshot(self, jpg_bytes: bytes, etag: str) -> None:
+        path = self._snapshot_path(etag)
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(jpg_bytes)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Failed to write snapshot file for %s: %s", self.cam_id, exc)
+            return
+
+        with self._snapshot_lock:
+            if not self.running:
+                # stop() has already collected this camera's files.
+                stale = [etag]
+            elif etag in self._snapshot_etags:
+                stale = []
+            else:
+                self._snapshot_etags.append(etag)
+                stale = self._snapshot_etags[:-SNAPSHOT_FILES_KEPT]
+                del self._snapshot_etags[:-SNAPSHOT_FILES_KEPT]
+        # Older frames are only removed once the new file is in place.
+        _remove_snapshot_files([self._snapshot_path(old) for old in stale])
 
     def get_frame(self, wait: bool = False, timeout: float = 1.0):
         if wait:
             self.idle_event.set()
-            deadline = time.time() + timeout
-            while time.time() < deadline:
-                with self.frame_lock:
-                    if self.latest_frame is not None:
-                        return self.latest_frame.copy()
-                time.sleep(0.05)
+            with self.frame_cond:
+                if not self.frame_cond.wait_for(lambda: self.latest_frame is not None, timeout=timeout):
+                    return None
+
+        return self.latest_frame
+
+    def get_frame_jpeg(self, quality: int = 80, wait: bool = False, timeout: float = 1.0) -> Optional[bytes]:
+        """Return the latest frame as JPEG, encoding each captured frame at most once."""
+
+        frame = self.get_frame(wait=wait, timeout=timeout)
+        if frame is None:
             return None
 
-        with self.frame_lock:
-            if self.latest_frame is None:
+        with self.encode_lock:
+            if self._jpeg_source is frame and self.latest_jpeg_quality == quality:
+                return self.latest_jpeg
+            jpg_bytes = self.encode(frame, quality=quality)
+            if jpg_bytes is not None:
+                self.latest_jpeg = jpg_bytes
+                self.latest_jpeg_quality = quality
+                self._jpeg_source = frame
+            return jpg_bytes
+
+    def encode(self, frame, quality: int = 80) -> Optional[bytes]:
+        """Encode frame as JPEG, in an encode worker process when ENCODE_WORKERS is set."""
+
+        if self.jpeg_frames:
+            # A flat read-only view over the captured JPEG (V4L2 hands it back
+            # as a 1xN array); viewers read the frame buffer without a copy.
+            return memoryview(frame).cast("B")
+
+        pool = _get_encode_pool()
+        if pool is None or not isinstance(frame, np.ndarray):
+            return _encode_frame(frame, quality=quality)
+
+        ring = self._shared_ring(frame.nbytes)
+        if ring is None:
+            return _encode_frame(frame, quality=quality)
+
+        self._ring_slots.acquire()
+        with self._ring_lock:
+            slot = self._ring_free.pop()
+        try:
+            offset = slot * self._ring_slot_size
+            target = np.ndarray(frame.shape, dtype=frame.dtype, buffer=ring.buf, offset=offset)
+            np.copyto(target, frame)
+            del target
+            future = pool.submit(_encode_shared_frame, ring.name, offset, frame.shape, frame.dtype.str, quality)
+            return future.result()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Encode worker failed for %s: %s; encoding in-process.", self.cam_id, exc)
+            return _encode_frame(frame, quality=quality)
+        finally:
+            with self._ring_lock:
+                self._ring_free.append(slot)
+            self._ring_slots.release()
+
+    def _shared_ring(self, frame_nbytes: int) -> Optional[shared_memory.SharedMemory]:
+        with self._ring_lock:
+            if self._ring is None:
+                self._ring = shared_memory.SharedMemory(create=True, size=frame_nbytes * ENCODE_RING_SLOTS)
+                self._ring_slot_size = frame_nbytes
+            if frame_nbytes != self._ring_slot_size:
+                # Resolution changed after a restart; encode those frames in-process.
                 return None
-            return self.latest_frame.copy()
+            return self._ring
+
+    def _release_ring(self) -> None:
+        with self._ring_lock:
+            ring, self._ring = self._ring, None
+        if ring is None:
+            return
+        # Unlink first: close() raises BufferError while a frame view is still
+        # exported, and that must not leave the segment behind in /dev/shm.
+        for release in (ring.unlink, ring.close):
+            try:
+                release()
+            except (BufferError, OSError) as exc:
+                logger.warning("Failed to release encode buffer for %s: %s", self.cam_id, exc)
 
     def stop(self) -> None:
         self.running = False
@@ -293,15 +639,82 @@ class Camera:
         self.thread.join(timeout=1)
         if self.cap:
             self.cap.release()
+        self._release_ring()
+        with self._snapshot_lock:
+            stale, self._snapshot_etags = self._snapshot_etags, []
+        if stale:
+            self._snapshot_cleanup = threading.Timer(
+                SNAPSHOT_FILE_GRACE,
+                _remove_snapshot_files,
+                args=([self._snapshot_path(etag) for etag in stale],),
+            )
+            self._snapshot_cleanup.start()
+
+
+def _remove_snapshot_files(paths: List[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+async def _notify_viewers(cond: asyncio.Condition) -> None:
+    async with cond:
+        cond.notify_all()
 
 
 def _encode_frame(frame, quality: int = 80) -> Optional[bytes]:
+    if simplejpeg is not None:
+        # Capture frames are contiguous uint8 BGR arrays, so libjpeg-turbo can read
+        # them in place without OpenCV's intermediate copy.
+        return simplejpeg.encode_jpeg(frame, quality=quality, colorspace="BGR", fastdct=True)
+    if _TURBOJPEG is not None:
+        return _TURBOJPEG.encode(frame, quality=quality, pixel_format=TJPF_BGR, flags=TJFLAG_FASTDCT)
+
     ret, jpeg = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
     if not ret:
         return None
     return jpeg.tobytes()
 
 
+_ENCODE_POOL: Optional[ProcessPoolExecutor] = None
+_ENCODE_POOL_LOCK = threading.Lock()
+
+
+def _get_encode_pool() -> Optional[ProcessPoolExecutor]:
+    global _ENCODE_POOL
+    if ENCODE_WORKERS <= 0:
+        return None
+
+    with _ENCODE_POOL_LOCK:
+        if _ENCODE_POOL is None:
+            # Spawn rather than fork: the server process already runs capture threads.
+            _ENCODE_POOL = ProcessPoolExecutor(
+                max_workers=ENCODE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _ENCODE_POOL
+
+
+def shutdown_encode_pool() -> None:
+    global _ENCODE_POOL
+    with _ENCODE_POOL_LOCK:
+        pool, _ENCODE_POOL = _ENCODE_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _encode_shared_frame(shm_name: str, offset: int, shape: tuple, dtype: str, quality: int) -> Optional[bytes]:
+    """Encode a frame stored in a camera's shared-memory ring (runs in a worker process)."""
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        jpg_bytes = _encode_frame(frame, quality=quality)
+        del frame
+        return jpg_bytes
+    finally:
+        shm.close()
+
+
 def _offline_placeholder(cam_id: str, width: Optional[int] = None, height: Optional[int] = None) -> bytes:
     """Return a small JPEG indicating the camera is offline.
 
@@ -317,8 +730,14 @@ def _offline_placeholder(cam_id: str, width: Optional[int] = None, height: Optio
     if height and not width:
         base_width = max(1, int(height * 4 / 3))
 
-    canvas = np.zeros((base_height, base_width, 3), dtype=np.uint8)
-    canvas[:] = (28, 35, 52)
+    return _placeholder_jpeg(cam_id, base_width, base_height, 85)
+
+
+@lru_cache(maxsize=32)
+def _placeholder_jpeg(cam_id: str, width: int, height: int, quality: int) -> bytes:
+    """Encode the offline placeholder once per camera, size, and quality."""
+
+    canvas = np.full((height, width, 3), (28, 35, 52), dtype=np.uint8)
     cv2.putText(
         canvas,
         f"{cam_id} offline",
@@ -329,7 +748,7 @@ def _offline_placeholder(cam_id: str, width: Optional[int] = None, height: Optio
         2,
         cv2.LINE_AA if hasattr(cv2, "LINE_AA") else 16,
     )
-    placeholder = _encode_frame(canvas, quality=85)
+    placeholder = _encode_frame(canvas, quality=quality)
     return placeholder or b""
 
 
@@ -389,6 +808,7 @@ def validate_camera_entries(cameras: List[Dict[str, Any]]) -> None:
         brightness = cam.get("brightness")
         exposure = cam.get("exposure")
         white_balance = cam.get("white_balance")
+        source = cam.get("source")
 
         if not cam_id:
             errors.append("Camera id is required.")
@@ -404,6 +824,10 @@ def validate_camera_entries(cameras: List[Dict[str, Any]]) -> None:
             errors.append(f"Camera '{cam_id or 'unknown'}' height must be positive when provided.")
         if fps is not None and fps <= 0:
             errors.append(f"Camera '{cam_id or 'unknown'}' fps must be positive when provided.")
+        if source is not None and source not in CAMERA_SOURCES:
+            errors.append(
+                f"Camera '{cam_id or 'unknown'}' source must be one of: {', '.join(CAMERA_SOURCES)}."
+            )
         for field_name, value in {
             "brightness": brightness,
             "exposure": exposure,
@@ -452,7 +876,7 @@ def validate_auth(auth_cfg: Dict[str, Any]) -> None:
 
 def load_config() -> Dict[str, Any]:
     if CONFIG_PATH.exists():
-        config = json.loads(CONFIG_PATH.read_text())
+        config = orjson.loads(CONFIG_PATH.read_bytes())
     else:
         config = default_config()
 
@@ -489,28 +913,31 @@ def load_config() -> Dict[str, Any]:
 
 
 def save_config(config: Dict[str, Any]) -> None:
-    CONFIG_PATH.write_text(json.dumps(config, indent=2))
+    CONFIG_PATH.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
 
 
 def assign_ports(cameras: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Ensure each camera has a unique port, auto-assigning if omitted or duplicated."""
 
     assigned: List[Dict[str, Any]] = []
-    used_ports: set[int] = set()
+    # Reserve explicit ports up front (first claim wins) so auto-assignment never
+    # hands out a port that a later camera asked for.
+    claimed: Dict[int, int] = {}
+    for idx, cam in enumerate(cameras):
+        port = cam.get("port")
+        if port is not None and port not in claimed:
+            claimed[port] = idx
+    used_ports: set[int] = set(claimed)
     next_port = DEFAULT_START_PORT
 
-    for cam in cameras:
+    for idx, cam in enumerate(cameras):
         cam_copy = dict(cam)
         port = cam_copy.get("port")
 
         if port is not None:
-            # Keep user-provided ports when available and unused.
-            if port in used_ports:
-                next_port = max(next_port, port + 1)
+            next_port = max(next_port, port + 1)
+            if claimed[port] != idx:
                 port = None
-            else:
-                used_ports.add(port)
-                next_port = max(next_port, port + 1)
 
         if port is None:
             while next_port in used_ports:
@@ -525,12 +952,90 @@ def assign_ports(cameras: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return assigned
 
 
+# Device controls reported by discovery, resolved once against this OpenCV build.
+DEVICE_CONTROL_PROPS = tuple(
+    (name, getattr(cv2, prop, None))
+    for name, prop in (
+        ("brightness", "CAP_PROP_BRIGHTNESS"),
+        ("exposure", "CAP_PROP_EXPOSURE"),
+        ("white_balance", "CAP_PROP_WB_TEMPERATURE"),
+    )
+)
+
+
+# Monotonic time of the last glob that found no /dev/video* nodes while
+# probing was off; repeat lookups within DISCOVERY_CACHE_TTL skip the glob.
+DISCOVERY_CACHE: Dict[str, float] = {}
+DISCOVERY_CACHE_TTL = 2.0
+# Recent successful probes per device index with their probe time, so repeated
+# discovery does not reopen every device within PROBE_CACHE_TTL seconds.
+# Failed opens are not kept: the device may be plugged in or released any time.
+PROBE_CACHE: Dict[int, tuple[float, Dict[str, Any]]] = {}
+PROBE_CACHE_TTL = 10.0
+
+
+def invalidate_discovery_cache() -> None:
+    DISCOVERY_CACHE.clear()
+    PROBE_CACHE.clear()
+
+
+def _cached_probe(idx: int) -> Optional[Dict[str, Any]]:
+    now = time.monotonic()
+    cached = PROBE_CACHE.get(idx)
+    if cached is not None and now - cached[0] < PROBE_CACHE_TTL:
+        return cached[1]
+    info = _probe_index(idx)
+    if info is None:
+        PROBE_CACHE.pop(idx, None)
+    else:
+        PROBE_CACHE[idx] = (now, info)
+    return info
+
+
+def _probe_index(idx: int) -> Optional[Dict[str, Any]]:
+    """Open one device index and report its mode and controls, or None if it cannot open."""
+
+    cap = cv2.VideoCapture(idx)
+    if not cap.isOpened():
+        cap.release()
+        return None
+
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+    fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    controls = {
+        name: float(cap.get(prop)) if prop is not None else None
+        for name, prop in DEVICE_CONTROL_PROPS
+    }
+    cap.release()
+
+    return {
+        "index": idx,
+        "resolution": {
+            "width": width or None,
+            "height": height or None,
+        },
+        "fps": fps or None,
+        "controls": controls,
+    }
+
+
 def discover_cameras(
     max_devices: Optional[int] = None, probe_when_empty: Optional[bool] = None
 ) -> List[Dict[str, Any]]:
     """Probe video capture devices and return detected indices and metadata."""
 
-    discovered: List[Dict[str, Any]] = []
+    probe_limit = max_devices if max_devices is not None else MAX_DEVICE_PROBE
+    should_probe_missing = (
+        probe_when_empty
+        if probe_when_empty is not None
+        else PROBE_WHEN_NO_DEVICES
+    )
+    probe_missing = should_probe_missing and probe_limit > 0
+    empty_seen = DISCOVERY_CACHE.get("no_devices")
+    if not probe_missing and empty_seen is not None and time.monotonic() - empty_seen < DISCOVERY_CACHE_TTL:
+        return []
+
     used_devices = {cam.get("device") for cam in CAMERA_CONFIG.get("cameras", [])}
     existing_nodes = sorted(
         {
@@ -539,64 +1044,27 @@ def discover_cameras(
             if Path(dev).name.replace("video", "").isdigit()
         }
     )
-    probe_limit = max_devices if max_devices is not None else MAX_DEVICE_PROBE
-    should_probe_missing = (
-        probe_when_empty
-        if probe_when_empty is not None
-        else PROBE_WHEN_NO_DEVICES
-    )
 
     if existing_nodes:
+        DISCOVERY_CACHE.pop("no_devices", None)
         probe_indices = existing_nodes
-    elif should_probe_missing and probe_limit > 0:
+    elif probe_missing:
         probe_indices = list(range(probe_limit))
     else:
+        DISCOVERY_CACHE["no_devices"] = time.monotonic()
         return []
 
-    for idx in probe_indices:
-        cap = cv2.VideoCapture(idx)
-        if not cap.isOpened():
-            cap.release()
-            continue
-
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
-        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
-        brightness = (
-            float(cap.get(cv2.CAP_PROP_BRIGHTNESS))
-            if hasattr(cv2, "CAP_PROP_BRIGHTNESS")
-            else None
-        )
-        exposure = (
-            float(cap.get(cv2.CAP_PROP_EXPOSURE))
-            if hasattr(cv2, "CAP_PROP_EXPOSURE")
-            else None
-        )
-        white_balance = (
-            float(cap.get(cv2.CAP_PROP_WB_TEMPERATURE))
-            if hasattr(cv2, "CAP_PROP_WB_TEMPERATURE")
-            else None
-        )
-        cap.release()
-
-        discovered.append(
-            {
-                "index": idx,
-                "in_use": idx in used_devices,
-                "resolution": {
-                    "width": width or None,
-                    "height": height or None,
-                },
-                "fps": fps or None,
-                "controls": {
-                    "brightness": brightness if brightness is not None else None,
-                    "exposure": exposure if exposure is not None else None,
-                    "white_balance": white_balance if white_balance is not None else None,
-                },
-            }
-        )
+    # Opening a V4L2 device blocks for a while, so probe them concurrently;
+    # map() keeps the results in index order. in_use is recomputed on every
+    # call since it follows the configuration, not the device.
+    with ThreadPoolExecutor(max_workers=min(8, len(probe_indices))) as pool:
+        probed = list(pool.map(_cached_probe, probe_indices))
 
-    return discovered
+    return [
+        {"index": info["index"], "in_use": info["index"] in used_devices, **info}
+        for info in probed
+        if info is not None
+    ]
 
 
 def generate_nginx_config(config: Dict[str, Any], output_path: Path = NGINX_CONFIG_PATH) -> None:
@@ -618,6 +1086,8 @@ def generate_nginx_config(config: Dict[str, Any], output_path: Path = NGINX_CONF
                 "    location / {",
                 f"        proxy_pass http://127.0.0.1:{APP_PORT}/cam/{cam_id}/video;",
                 "        proxy_set_header Host $host;",
+                "        proxy_buffering off;",
+                "        gzip off;",
                 "    }",
                 "    location /snapshot {",
                 f"        proxy_pass http://127.0.0.1:{APP_PORT}/cam/{cam_id}/snapshot;",
@@ -651,6 +1121,14 @@ class CameraConfig(BaseModel):
     white_balance: Optional[float] = Field(
         default=None, description="White balance temperature"
     )
+    mjpeg_passthrough: bool = Field(
+        default=False,
+        description="Capture MJPEG from the device and stream its JPEG frames without re-encoding",
+    )
+    source: str = Field(
+        default="opencv",
+        description="Capture backend: 'opencv' (USB/V4L2) or 'picamera2' (CSI, hardware JPEG)",
+    )
 
 
 class AuthConfig(BaseModel):
@@ -675,6 +1153,40 @@ class CamerasUpdate(BaseModel):
 
 CAMERAS: Dict[str, Optional[Camera]] = {}
 CAMERA_CONFIG: Dict[str, Any] = default_config()
+# Rendered HTML for pages that only change with CAMERA_CONFIG.
+PAGE_CACHE: Dict[str, bytes] = {}
+
+
+def _cached_page(key: str, render: Callable[[], str]) -> HTMLResponse:
+    content = PAGE_CACHE.get(key)
+    if content is None:
+        content = PAGE_CACHE[key] = render().encode()
+    return HTMLResponse(content=content)
+
+
+def invalidate_page_cache() -> None:
+    PAGE_CACHE.clear()
+
+
+def _cached_status(key: str, build: Callable[[], Any]) -> Any:
+    now = time.monotonic()
+    cached = STATUS_CACHE.get(key)
+    if cached is not None and now - cached[0] < STATUS_CACHE_TTL:
+        return cached[1]
+    value = build()
+    STATUS_CACHE[key] = (now, value)
+    return value
+
+
+def invalidate_status_cache() -> None:
+    STATUS_CACHE.clear()
+
+
+def _invalidate_config_caches() -> None:
+    invalidate_page_cache()
+    invalidate_status_cache()
+    # Cameras are reopened after a config change, which frees or claims devices.
+    invalidate_discovery_cache()
 
 
 def _auth_enabled() -> bool:
@@ -732,7 +1244,7 @@ def stop_cameras() -> None:
         if camera:
             camera.stop()
     CAMERAS.clear()
-    CAMERA_STATUS.clear()
+    _publish_status({}, replace=True)
 
 
 def restart_camera(cam_id: str) -> Dict[str, Any]:
@@ -756,16 +1268,14 @@ def restart_camera(cam_id: str) -> Dict[str, Any]:
             brightness=cam_cfg.get("brightness"),
             exposure=cam_cfg.get("exposure"),
             white_balance=cam_cfg.get("white_balance"),
+            mjpeg_passthrough=bool(cam_cfg.get("mjpeg_passthrough")),
+            source=cam_cfg.get("source") or "opencv",
         )
         CAMERAS[cam_id] = new_cam
         return {"status": "restarted"}
     except Exception as exc:  # noqa: BLE001
         logger.error("Manual restart failed for %s: %s", cam_id, exc)
-        CAMERA_STATUS[cam_id] = {
-            "state": "offline",
-            "message": str(exc),
-            "device": cam_cfg.get("device"),
-        }
+        _set_status(cam_id, "offline", str(exc), cam_cfg.get("device"))
         CAMERAS[cam_id] = None  # type: ignore[assignment]
         raise HTTPException(status_code=503, detail=f"Restart failed: {exc}")
 
@@ -782,6 +1292,8 @@ def init_cameras() -> None:
         brightness = cam_cfg.get("brightness")
         exposure = cam_cfg.get("exposure")
         white_balance = cam_cfg.get("white_balance")
+        mjpeg_passthrough = bool(cam_cfg.get("mjpeg_passthrough"))
+        source = cam_cfg.get("source") or "opencv"
 
         try:
             camera = Camera(
@@ -793,14 +1305,12 @@ def init_cameras() -> None:
                 brightness=brightness,
                 exposure=exposure,
                 white_balance=white_balance,
+                mjpeg_passthrough=mjpeg_passthrough,
+                source=source,
             )
         except Exception as exc:  # noqa: BLE001
             logger.error("Failed to initialize camera %s: %s", cam_id, exc)
-            CAMERA_STATUS[cam_id] = {
-                "state": "offline",
-                "message": str(exc),
-                "device": device_index,
-            }
+            _set_status(cam_id, "offline", str(exc), device_index)
             # Create a stub entry so placeholders continue to work even when init fails
             camera = None
 
@@ -816,47 +1326,46 @@ def init_cameras() -> None:
 ###############################################################################
 
 
+def _pack_mjpeg_part(jpg_bytes: bytes) -> bytes:
+    """Frame a JPEG as one multipart part so it goes out in a single send."""
+
+    return b"".join((MJPEG_PART_HEADER % len(jpg_bytes), jpg_bytes, MJPEG_PART_END))
+
+
 async def mjpeg_generator(cam_id: str):
     config_exists = any(c.get("id") == cam_id for c in CAMERA_CONFIG.get("cameras", []))
     camera = CAMERAS.get(cam_id)
-    boundary = "frame"
 
     if camera is None and not config_exists:
         raise HTTPException(status_code=404, detail="Camera not found")
 
-    if camera:
-        camera.add_subscriber()
-
-    try:
+    if camera is None:
+        width, height = _configured_resolution(cam_id)
         while True:
-            if camera:
-                frame = await asyncio.to_thread(camera.get_frame, True, 1.0)
-                if frame is None:
-                    width, height = _configured_resolution(cam_id)
-                    jpg_bytes = _offline_placeholder(cam_id, width, height)
-                    sleep_interval = 1.0
-                else:
-                    jpg_bytes = _encode_frame(frame, quality=80)
-                    if jpg_bytes is None:
-                        await asyncio.sleep(camera.capture_interval)
-                        continue
-                    sleep_interval = camera.capture_interval
-            else:
+            jpg_bytes = _offline_placeholder(cam_id, width, height)
+            yield _pack_mjpeg_part(jpg_bytes)
+            await asyncio.sleep(1.0)
+
+    async with camera.subscribe() as cond:
+        # Start one behind the current frame so a frame already encoded for
+        # other viewers is sent straight away.
+        last_seq = max(camera.frame_seq - 1, 0)
+        # Frames arrive at capture rate, so only a wait well past the capture
+        # interval means the camera stalled; slow (<= 1 fps) cameras are not.
+        stall_timeout = max(1.0, 2 * camera.capture_interval)
+        while True:
+            latest = await camera.next_part(cond, last_seq, timeout=stall_timeout)
+            if latest is None:
                 width, height = _configured_resolution(cam_id)
-                jpg_bytes = _offline_placeholder(cam_id, width, height)
-                sleep_interval = 1.0
+                yield _pack_mjpeg_part(_offline_placeholder(cam_id, width, height))
+            else:
+                last_seq, part = latest
+                yield part
 
-            yield (
-                b"--" + boundary.encode() + b"\r\n"
-                b"Content-Type: image/jpeg\r\n\r\n" + jpg_bytes + b"\r\n"
-            )
-            await asyncio.sleep(sleep_interval)
-    finally:
-        if camera:
-            camera.remove_subscriber()
 
+def get_snapshot(cam_id: str) -> tuple[bytes, Optional[str]]:
+    """Return snapshot JPEG bytes and the frame's ETag (None for placeholders)."""
 
-def get_snapshot_bytes(cam_id: str) -> bytes:
     camera = CAMERAS.get(cam_id)
     config_exists = any(c.get("id") == cam_id for c in CAMERA_CONFIG.get("cameras", []))
 
@@ -865,27 +1374,39 @@ def get_snapshot_bytes(cam_id: str) -> bytes:
 
     if not camera:
         target_width, target_height = _configured_resolution(cam_id)
-        return _offline_placeholder(cam_id, width=target_width, height=target_height)
+        return _offline_placeholder(cam_id, width=target_width, height=target_height), None
 
     frame = camera.get_frame(wait=True, timeout=1.5)
     if frame is None:
         logger.warning("No frame available for %s; returning placeholder.", cam_id)
         target_width, target_height = _configured_resolution(cam_id)
-        return _offline_placeholder(cam_id, width=target_width, height=target_height)
+        return _offline_placeholder(cam_id, width=target_width, height=target_height), None
 
-    jpg_bytes = _encode_frame(frame, quality=90)
+    # Goes through the camera so snapshots use the encode workers too; cameras
+    # that deliver JPEG serve the device's own frame instead of re-encoding.
+    jpg_bytes = camera.encode(frame, quality=90)
     if jpg_bytes is None:
         target_width, target_height = _configured_resolution(cam_id)
         placeholder = _offline_placeholder(cam_id, width=target_width, height=target_height)
         if placeholder:
-            return placeholder
+            return placeholder, None
         raise HTTPException(status_code=500, detail="Failed to encode frame")
-    return jpg_bytes
+    jpg_bytes = bytes(jpg_bytes)
+
+    etag = camera.frame_etag(frame)
+    if SNAPSHOT_DIR and etag:
+        camera.store_snapshot(jpg_bytes, etag)
+    return jpg_bytes, etag
+
+
+def get_snapshot_bytes(cam_id: str) -> bytes:
+    return get_snapshot(cam_id)[0]
 
 
 def camera_statuses() -> List[Dict[str, Any]]:
     now = time.time()
     configs = {cam.get("id"): cam for cam in CAMERA_CONFIG.get("cameras", [])}
+    reported = CAMERA_STATUS
     statuses: List[Dict[str, Any]] = []
 
     for cam_id, cfg in configs.items():
@@ -900,8 +1421,7 @@ def camera_statuses() -> List[Dict[str, Any]]:
             "subscribers": 0,
         }
 
-        if cam_id in CAMERA_STATUS:
-            status.update(CAMERA_STATUS[cam_id])
+        status.update(reported.get(cam_id, {}))
 
         camera = CAMERAS.get(cam_id)
         if camera:
@@ -928,6 +1448,7 @@ def camera_statuses() -> List[Dict[str, Any]]:
 def startup_event() -> None:
     global CAMERA_CONFIG
     CAMERA_CONFIG = load_config()
+    _invalidate_config_caches()
     init_cameras()
     generate_nginx_config(CAMERA_CONFIG)
     logger.info("Camera server started with %d configured camera(s)", len(CAMERA_CONFIG.get("cameras", [])))
@@ -937,6 +1458,7 @@ def startup_event() -> None:
 def shutdown_event() -> None:
     logger.info("Shutting down camera server")
     stop_cameras()
+    shutdown_encode_pool()
 
 
 def _base_page(title: str, active: str, body: str) -> str:
@@ -1067,6 +1589,10 @@ def _base_page(title: str, active: str, body: str) -> str:
 
 @app.get("/", response_class=HTMLResponse)
 def index_page():
+    return _cached_page("home", _render_index_page)
+
+
+def _render_index_page() -> str:
     host = CAMERA_CONFIG.get("host", DEFAULT_CAMERA_HOST)
     cards = []
     for cam in CAMERA_CONFIG.get("cameras", []):
@@ -1106,7 +1632,7 @@ def index_page():
                     <img src='/cam/{cam_id}/video' style='width:100%; border:1px solid var(--border); border-radius:10px;'>
                 </div>
                 <div style='display:flex; gap:12px; align-items:center; flex-wrap:wrap;'>
-                    <img id='snap-{cam_id}' src='/cam/{cam_id}/snapshot' style='width:140px; border:1px solid var(--border); border-radius:8px;'>
+                    <img id='snap-{cam_id}' src='/cam/{cam_id}/snapshot' data-src='/cam/{cam_id}/snapshot' style='width:140px; border:1px solid var(--border); border-radius:8px;'>
                     <div>
                         <div class='muted'>Main API</div>
                         <code>/cam/{cam_id}/video</code><br>
@@ -1139,12 +1665,25 @@ def index_page():
                 }}
             }}
 
+            async function refreshSnapshot(img) {{
+                try {{
+                    // Revalidate with If-None-Match; unchanged frames come back as 304.
+                    const res = await fetch(img.dataset.src, {{ cache: 'no-cache' }});
+                    if (!res.ok) return;
+                    const etag = res.headers.get('ETag');
+                    if (etag && etag === img.dataset.etag) return;
+                    img.dataset.etag = etag || '';
+                    const url = URL.createObjectURL(await res.blob());
+                    if (img.dataset.blob) URL.revokeObjectURL(img.dataset.blob);
+                    img.dataset.blob = url;
+                    img.src = url;
+                }} catch (err) {{
+                    console.warn('Snapshot refresh failed', err);
+                }}
+            }}
+
             setInterval(() => {{
-                const imgs = document.querySelectorAll("img[id^='snap-']");
-                imgs.forEach(img => {{
-                    const base = img.src.split('?')[0];
-                    img.src = base + "?t=" + Date.now();
-                }});
+                document.querySelectorAll("img[id^='snap-']").forEach(refreshSnapshot);
             }}, 2000);
 
             async function refreshHealth() {{
@@ -1174,6 +1713,10 @@ def index_page():
 
 @app.get("/settings", response_class=HTMLResponse, dependencies=[Depends(require_auth)])
 def settings_page():
+    return _cached_page("settings", _render_settings_page)
+
+
+def _render_settings_page() -> str:
     body = """
         <div class='card'>
             <div style='display:flex; justify-content:space-between; align-items:center; gap:12px; flex-wrap:wrap;'>
@@ -1309,6 +1852,8 @@ def settings_page():
                     <td><input class='input' value='${cam.white_balance ?? ''}' type='number' step='1' min='0' max='12000' style='width:120px' placeholder='0–12000' title='White balance range 0–12,000 (Kelvin if supported); blank uses camera default'></td>
                     <td style='width:60px; text-align:right;'><button class='btn-secondary btn' onclick='this.closest("tr").remove(); updateDeviceSelects();'>✖</button></td>
                 `;
+                // Keep fields the table has no column for (e.g. mjpeg_passthrough) across saves.
+                tr.dataset.extra = JSON.stringify(cam);
                 tbody.appendChild(tr);
                 updateDeviceSelects();
             }
@@ -1438,7 +1983,7 @@ def settings_page():
                     if (exposureNum !== null && !Number.isFinite(exposureNum)) errors.push(`Camera "${id || '(new)'}" exposure must be numeric.`);
                     if (whiteBalanceNum !== null && !Number.isFinite(whiteBalanceNum)) errors.push(`Camera "${id || '(new)'}" white balance must be numeric.`);
 
-                    return { id, name, device: deviceNum, port: portNum, width: widthNum, height: heightNum, fps: fpsNum, brightness: brightnessNum, exposure: exposureNum, white_balance: whiteBalanceNum };
+                    return { ...JSON.parse(r.dataset.extra || '{}'), id, name, device: deviceNum, port: portNum, width: widthNum, height: heightNum, fps: fpsNum, brightness: brightnessNum, exposure: exposureNum, white_balance: whiteBalanceNum };
                 }).filter(c => c.id);
 
                 if (errors.length) {
@@ -1474,6 +2019,10 @@ def settings_page():
 
 @app.get("/api-docs", response_class=HTMLResponse, dependencies=[Depends(require_auth)])
 def api_docs_page():
+    return _cached_page("docs", _render_api_docs_page)
+
+
+def _render_api_docs_page() -> str:
     host = CAMERA_CONFIG.get("host", DEFAULT_CAMERA_HOST)
     rows = []
     for cam in CAMERA_CONFIG.get("cameras", []):
@@ -1499,7 +2048,7 @@ def api_docs_page():
                 <li><code>GET /metrics</code> — Prometheus-style gauges for availability, subscribers, and frame ages.</li>
             </ul>
             <p class='muted'>Optional basic auth (configured in Settings) secures these endpoints and the Settings/API Docs pages; you can also opt-in to protecting streams.</p>
-            <p class='muted'>Camera fields: <code>id</code>, <code>name</code>, <code>device</code>, optional <code>port</code>, <code>width</code>, <code>height</code>, <code>fps</code>, and optional controls <code>brightness</code>, <code>exposure</code>, <code>white_balance</code>.</p>
+            <p class='muted'>Camera fields: <code>id</code>, <code>name</code>, <code>device</code>, optional <code>port</code>, <code>width</code>, <code>height</code>, <code>fps</code>, and optional controls <code>brightness</code>, <code>exposure</code>, <code>white_balance</code>, and <code>mjpeg_passthrough</code> to stream the device's own MJPEG frames, and <code>source</code> (<code>opencv</code> or <code>picamera2</code>).</p>
             <h3>Streaming</h3>
             <p class='muted'>Replace <code>{{cam_id}}</code> with a configured camera ID.</p>
             <ul>
@@ -1535,19 +2084,17 @@ def get_cameras():
 @app.post("/api/cameras", dependencies=[Depends(require_auth)])
 def set_cameras(data: CamerasUpdate):
     global CAMERA_CONFIG
-    camera_dicts = [cam.model_dump() for cam in data.cameras]
+    payload = data.model_dump()
     try:
-        validate_auth(data.auth.model_dump())
-        validate_camera_entries(camera_dicts)
+        validate_auth(payload["auth"])
+        validate_camera_entries(payload["cameras"])
     except ValueError as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    CAMERA_CONFIG = {
-        "host": data.host,
-        "auth": data.auth.model_dump(),
-        "cameras": assign_ports(camera_dicts),
-    }
+    payload["cameras"] = assign_ports(payload["cameras"])
+    CAMERA_CONFIG = payload
     save_config(CAMERA_CONFIG)
+    _invalidate_config_caches()
     init_cameras()
     generate_nginx_config(CAMERA_CONFIG)
     return {"status": "ok", "cameras": CAMERA_CONFIG}
@@ -1567,13 +2114,25 @@ def delete_camera(cam_id: str):
 
     CAMERA_CONFIG["cameras"] = assign_ports(cameras)
     save_config(CAMERA_CONFIG)
+    _invalidate_config_caches()
     init_cameras()
     generate_nginx_config(CAMERA_CONFIG)
     return {"status": "deleted", "cameras": CAMERA_CONFIG["cameras"]}
 
 
+def health() -> Dict[str, Any]:
+    return _cached_status("health", _build_health)[0]
+
+
 @app.get("/health")
-def health():
+def health_endpoint():
+    body = _cached_status("health", _build_health)[1]
+    return Response(body, media_type="application/json")
+
+
+def _build_health() -> tuple[Dict[str, Any], bytes]:
+    """Build the health payload and its JSON body together, under one cache entry."""
+
     statuses = camera_statuses()
     summary = {
         "total": len(statuses),
@@ -1581,11 +2140,19 @@ def health():
         "stale": sum(1 for s in statuses if s.get("state") == "stale"),
         "offline": sum(1 for s in statuses if s.get("state") == "offline"),
     }
-    return {"status": "ok", "summary": summary, "cameras": statuses}
+    payload = {"status": "ok", "summary": summary, "cameras": statuses}
+    # Serialized with orjson once per cached payload rather than by
+    # JSONResponse on every poll.
+    return payload, orjson.dumps(payload)
 
 
 @app.get("/metrics")
 def metrics():
+    body = _cached_status("metrics", _render_metrics)
+    return Response(body, media_type="text/plain; version=0.0.4")
+
+
+def _render_metrics() -> bytes:
     statuses = camera_statuses()
     lines = [
         "# HELP rpicam_camera_online Camera availability (1=online, 0=offline/stale)",
@@ -1617,21 +2184,50 @@ def metrics():
             continue
         lines.append(f'rpicam_camera_frame_age_seconds{{camera="{st.get("id")}"}} {age:.3f}')
 
-    return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+    return ("\n".join(lines) + "\n").encode()
 
 
-@app.get("/cam/{cam_id}/video", dependencies=[Depends(require_stream_auth)])
+@app.get(
+    "/cam/{cam_id}/video",
+    dependencies=[Depends(require_stream_auth)],
+    response_class=StreamingResponse,
+    responses={200: {"content": {"multipart/x-mixed-replace": {}}, "description": "MJPEG stream"}},
+)
 async def video_stream(cam_id: str):
     return StreamingResponse(
         mjpeg_generator(cam_id),
-        media_type="multipart/x-mixed-replace; boundary=frame",
+        media_type=MJPEG_MEDIA_TYPE,
+        headers=MJPEG_HEADERS,
     )
 
 
 @app.get("/cam/{cam_id}/snapshot", dependencies=[Depends(require_stream_auth)])
-async def snapshot(cam_id: str):
-    img_bytes = await asyncio.to_thread(get_snapshot_bytes, cam_id)
-    return Response(content=img_bytes, media_type="image/jpeg")
+async def snapshot(cam_id: str, if_none_match: Optional[str] = Header(default=None)):
+    camera = CAMERAS.get(cam_id)
+    etag = camera.frame_etag() if camera else None
+    if camera and etag:
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            # Nudge an idle capture loop so the next poll can see a newer frame.
+            camera.idle_event.set()
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        stored = camera.snapshot_file(etag) if SNAPSHOT_DIR else None
+        if stored is not None:
+            # Already encoded for this frame; let the server stream the tmpfs file.
+            camera.idle_event.set()
+            snapshot_path, stat_result = stored
+            return FileResponse(
+                snapshot_path,
+                media_type="image/jpeg",
+                headers={"ETag": etag, "Cache-Control": "no-cache"},
+                stat_result=stat_result,
+            )
+
+    img_bytes, etag = await asyncio.to_thread(get_snapshot, cam_id)
+    headers = {"Cache-Control": "no-cache"}
+    if etag:
+        headers["ETag"] = etag
+    return Response(content=img_bytes, media_type="image/jpeg", headers=headers)
 
 
 if __name__ == "__main__":
@@ -2,29 +2,47 @@
 
 import argparse
 import base64
-import json
+import functools
+import importlib.util
 import os
 import sys
-from typing import Any, Dict
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 import httpx
+import orjson
 
 DEFAULT_BASE = os.getenv("RPICAM_BASE_URL", "http://127.0.0.1:8000")
 DEFAULT_AUTH = os.getenv("RPICAM_AUTH", "")
+# httpx only negotiates HTTP/2 (over TLS) when the optional h2 package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
-def _build_headers() -> Dict[str, str]:
+@functools.lru_cache(maxsize=1)
+def _build_headers() -> Mapping[str, str]:
     if not DEFAULT_AUTH:
-        return {}
+        return MappingProxyType({})
     if ":" not in DEFAULT_AUTH:
-        return {}
-    user, pwd = DEFAULT_AUTH.split(":", 1)
-    token = base64.b64encode(f"{user}:{pwd}".encode()).decode()
-    return {"Authorization": f"Basic {token}"}
+        return MappingProxyType({})
+    # RPICAM_AUTH is already "user:pass", the exact string Basic auth encodes.
+    token = base64.b64encode(DEFAULT_AUTH.encode()).decode()
+    return MappingProxyType({"Authorization": f"Basic {token}"})
 
 
 def _client(base_url: str) -> httpx.Client:
-    return httpx.Client(base_url=base_url.rstrip("/"), headers=_build_headers(), timeout=10)
+    return httpx.Client(
+        base_url=base_url.rstrip("/"),
+        headers=_build_headers(),
+        timeout=10,
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
+
+
+def _print_json(res: httpx.Response) -> None:
+    data = orjson.loads(res.content)
+    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
 
 
 def cmd_devices(args: argparse.Namespace) -> int:
@@ -36,8 +54,7 @@ def cmd_devices(args: argparse.Namespace) -> int:
     with _client(args.base_url) as client:
         res = client.get("/api/devices", params=params)
         res.raise_for_status()
-        json.dump(res.json(), sys.stdout, indent=2)
-        sys.stdout.write("\n")
+        _print_json(res)
     return 0
 
 
@@ -45,8 +62,7 @@ def cmd_health(args: argparse.Namespace) -> int:
     with _client(args.base_url) as client:
         res = client.get("/health")
         res.raise_for_status()
-        json.dump(res.json(), sys.stdout, indent=2)
-        sys.stdout.write("\n")
+        _print_json(res)
     return 0
 
 
@@ -54,24 +70,26 @@ def cmd_config(args: argparse.Namespace) -> int:
     with _client(args.base_url) as client:
         res = client.get("/api/cameras")
         res.raise_for_status()
-        json.dump(res.json(), sys.stdout, indent=2)
-        sys.stdout.write("\n")
+        _print_json(res)
     return 0
 
 
 def cmd_set(args: argparse.Namespace) -> int:
     payload: Dict[str, Any]
     if args.file == "-":
-        payload = json.load(sys.stdin)
+        payload = orjson.loads(sys.stdin.buffer.read())
     else:
-        with open(args.file, "r", encoding="utf-8") as f:
-            payload = json.load(f)
+        with open(args.file, "rb") as f:
+            payload = orjson.loads(f.read())
 
     with _client(args.base_url) as client:
-        res = client.post("/api/cameras", json=payload)
+        res = client.post(
+            "/api/cameras",
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
         res.raise_for_status()
-        json.dump(res.json(), sys.stdout, indent=2)
-        sys.stdout.write("\n")
+        _print_json(res)
     return 0
 
 
@@ -89,6 +107,29 @@ def cmd_snapshot(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_watch(args: argparse.Namespace) -> int:
+    saved = 0
+    etag = None
+    with _client(args.base_url) as client:
+        try:
+            while not args.count or saved < args.count:
+                started = time.monotonic()
+                headers = {"If-None-Match": etag} if etag else None
+                res = client.get(f"/cam/{args.camera}/snapshot", headers=headers)
+                if res.status_code != 304:
+                    res.raise_for_status()
+                    etag = res.headers.get("ETag")
+                    path = args.output.format(camera=args.camera, n=saved)
+                    with open(path, "wb") as f:
+                        f.write(res.content)
+                    print(f"Saved snapshot to {path}")
+                    saved += 1
+                time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--base-url", default=DEFAULT_BASE, help=f"Server base URL (default: {DEFAULT_BASE})")
@@ -115,6 +156,17 @@ def build_parser() -> argparse.ArgumentParser:
     snap.add_argument("--output", default="-", help="Output path or - for stdout")
     snap.set_defaults(func=cmd_snapshot)
 
+    watch = sub.add_parser("watch", help="Save snapshots repeatedly over one connection")
+    watch.add_argument("camera", help="Camera id")
+    watch.add_argument("--interval", type=float, default=2.0, help="Seconds between snapshots (default: 2)")
+    watch.add_argument("--count", type=int, default=0, help="Stop after this many snapshots (default: run until interrupted)")
+    watch.add_argument(
+        "--output",
+        default="{camera}-{n:05d}.jpg",
+        help="Output path pattern using {camera} and {n} (default: {camera}-{n:05d}.jpg)",
+    )
+    watch.set_defaults(func=cmd_watch)
+
     return parser
 
 
@@ -13,6 +13,8 @@ Options:
   --with-systemd      Install and start the systemd service
   --no-systemd        Skip systemd installation
   --no-apt            Skip apt-get package installation
+  --system-site-packages
+                      Let the venv see apt-installed modules (python3-picamera2)
   --help              Show this help message
 
 Environment variables:
@@ -26,6 +28,7 @@ INSTALL_DIR="/opt/rpicamserver"
 INSTALL_NGINX="ask"
 INSTALL_SYSTEMD="ask"
 SKIP_APT=false
+SYSTEM_SITE_PACKAGES=false
 APP_PORT="${APP_PORT:-8000}"
 SERVICE_USER="${SERVICE_USER:-${SUDO_USER:-$(whoami)}}"
 
@@ -59,6 +62,10 @@ while [[ $# -gt 0 ]]; do
       SKIP_APT=true
       shift
       ;;
+    --system-site-packages)
+      SYSTEM_SITE_PACKAGES=true
+      shift
+      ;;
     --help)
       usage
       exit 0
@@ -132,8 +139,13 @@ ensure_repo() {
 }
 
 install_python_deps() {
+  local venv_args=()
+  if [[ "$SYSTEM_SITE_PACKAGES" == true ]]; then
+    venv_args+=(--system-site-packages)
+  fi
+
   echo "Creating virtual environment in $INSTALL_DIR/.venv…"
-  sudo python3 -m venv "$INSTALL_DIR/.venv"
+  sudo python3 -m venv "${venv_args[@]}" "$INSTALL_DIR/.venv"
   sudo "$INSTALL_DIR/.venv/bin/pip" install --upgrade pip
   sudo "$INSTALL_DIR/.venv/bin/pip" install -r "$INSTALL_DIR/requirements.txt"
 }
@@ -42,10 +42,14 @@ class _DummyCap:
 
 
 cv2_stub = types.SimpleNamespace(
-    VideoCapture=lambda index: _DummyCap(index),
+    VideoCapture=lambda index, *_args: _DummyCap(index),
+    VideoWriter_fourcc=lambda *chars: sum(ord(c) << (8 * i) for i, c in enumerate(chars)),
+    CAP_V4L2=200,
     CAP_PROP_FRAME_WIDTH=3,
     CAP_PROP_FRAME_HEIGHT=4,
     CAP_PROP_FPS=5,
+    CAP_PROP_FOURCC=6,
+    CAP_PROP_CONVERT_RGB=16,
     CAP_PROP_BRIGHTNESS=10,
     CAP_PROP_EXPOSURE=15,
     CAP_PROP_WB_TEMPERATURE=20,
@@ -56,7 +60,12 @@ cv2_stub = types.SimpleNamespace(
     putText=lambda img, *args, **kwargs: img,
 )
 
+simplejpeg_stub = types.SimpleNamespace(
+    encode_jpeg=lambda *_args, **_kwargs: b"jpeg-bytes",
+)
+
 sys.modules.setdefault("cv2", cv2_stub)
+sys.modules.setdefault("simplejpeg", simplejpeg_stub)
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
@@ -85,6 +94,10 @@ def isolate_app(monkeypatch, tmp_path):
     app.CAMERA_CONFIG = app.default_config()
     app.CAMERAS = {}
     app.CAMERA_STATUS = {}
+    app.invalidate_page_cache()
+    app.invalidate_status_cache()
+    app.invalidate_discovery_cache()
+    app._placeholder_jpeg.cache_clear()
 
     yield tmp_config
 
@@ -100,6 +113,20 @@ def device_registry():
     DEVICE_REGISTRY.clear()
 
 
+@pytest.fixture
+def opened_devices(monkeypatch):
+    """Record each device index passed to cv2.VideoCapture."""
+    opened = []
+    video_capture = app.cv2.VideoCapture
+
+    def counting_capture(index, *args):
+        opened.append(index)
+        return video_capture(index, *args)
+
+    monkeypatch.setattr(app.cv2, "VideoCapture", counting_capture)
+    return opened
+
+
 @pytest.fixture
 def client():
     pytest.importorskip("httpx")
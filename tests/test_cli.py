@@ -0,0 +1,36 @@
+import httpx
+
+import cli
+
+
+def test_watch_sends_etag_and_skips_unchanged_snapshots(monkeypatch, tmp_path):
+    responses = [
+        httpx.Response(200, content=b"first", headers={"ETag": '"a"'}),
+        httpx.Response(304, headers={"ETag": '"a"'}),
+        httpx.Response(200, content=b"second", headers={"ETag": '"b"'}),
+        httpx.Response(200, content=b"unexpected", headers={"ETag": '"c"'}),
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    def mock_client(base_url):
+        return httpx.Client(base_url=base_url, transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(cli, "_client", mock_client)
+
+    output = str(tmp_path / "{camera}-{n}.jpg")
+    assert cli.main(["watch", "cam1", "--interval", "0", "--count", "2", "--output", output]) == 0
+
+    # --count stops the loop once two snapshots are saved; the 304 does not count.
+    assert len(requests) == 3
+    assert all(req.url.path == "/cam/cam1/snapshot" for req in requests)
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"a"'
+    assert requests[2].headers["If-None-Match"] == '"a"'
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cam1-0.jpg", "cam1-1.jpg"]
+    assert (tmp_path / "cam1-0.jpg").read_bytes() == b"first"
+    assert (tmp_path / "cam1-1.jpg").read_bytes() == b"second"
@@ -24,6 +24,17 @@ def test_assign_ports_handles_duplicates_and_missing():
     assert ports[2] == 8084
 
 
+def test_assign_ports_keeps_later_explicit_port():
+    cameras = [
+        {"id": "cam1", "name": "One", "device": 0},
+        {"id": "cam2", "name": "Two", "device": 1, "port": 8081},
+    ]
+
+    ports = [cam["port"] for cam in app.assign_ports(cameras)]
+
+    assert ports == [8082, 8081]
+
+
 def test_validate_camera_entries_detects_conflicts():
     valid = [{"id": "cam1", "name": "One", "device": 0, "port": 8081}]
     app.validate_camera_entries(valid)
@@ -63,6 +74,10 @@ def test_validate_camera_entries_detects_conflicts():
             [{"id": "camC", "name": "Ctrl", "device": 0, "brightness": "abc"}]
         )
 
+    app.validate_camera_entries([{"id": "camPi", "name": "Pi", "device": 0, "source": "picamera2"}])
+    with pytest.raises(ValueError):
+        app.validate_camera_entries([{"id": "camS", "name": "Src", "device": 0, "source": "gstreamer"}])
+
     with pytest.raises(ValueError):
         app.validate_camera_entries(
             [
@@ -163,3 +178,37 @@ def test_require_auth_guard(monkeypatch):
     bad = HTTPBasicCredentials(username="user", password="nope")
     with pytest.raises(HTTPException):
         app.require_auth(bad)
+
+
+def test_index_page_cache_refreshes_after_config_change(client):
+    assert "camNew" not in client.get("/").text
+
+    app.set_cameras(
+        app.CamerasUpdate(
+            host="0.0.0.0",
+            cameras=[{"id": "camNew", "name": "New", "device": 0}],
+        )
+    )
+
+    assert "camNew" in client.get("/").text
+
+
+def test_settings_page_cached_until_config_change(client, monkeypatch):
+    monkeypatch.setattr(app, "MAX_DEVICE_PROBE", 4)
+    res = client.get("/settings")
+    assert res.status_code == 200
+    assert "Camera configuration" in res.text
+    assert "const defaultProbeLimit = 4;" in res.text
+
+    # Served from the page cache while the configuration is unchanged.
+    monkeypatch.setattr(app, "MAX_DEVICE_PROBE", 7)
+    assert "const defaultProbeLimit = 4;" in client.get("/settings").text
+
+    app.set_cameras(
+        app.CamerasUpdate(
+            host="0.0.0.0",
+            cameras=[{"id": "camNew", "name": "New", "device": 0}],
+        )
+    )
+
+    assert "const defaultProbeLimit = 7;" in client.get("/settings").text
@@ -1,3 +1,11 @@
+import multiprocessing
+import threading
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
 import pytest
 
 import app
@@ -31,6 +39,51 @@ def test_discover_respects_probe_limits(monkeypatch, device_registry):
     assert devices[0]["index"] == 0
 
 
+def test_discover_skips_glob_while_no_devices_cached(monkeypatch):
+    monkeypatch.setattr(app, "PROBE_WHEN_NO_DEVICES", False)
+    globs = []
+    monkeypatch.setattr(app.glob, "glob", lambda *_args: globs.append(1) or [])
+
+    assert app.discover_cameras() == []
+    assert app.discover_cameras() == []
+    assert len(globs) == 1
+
+    app.invalidate_discovery_cache()
+    assert app.discover_cameras() == []
+    assert len(globs) == 2
+
+
+def test_discover_reuses_recent_probe_results(monkeypatch, device_registry, opened_devices):
+    device_registry[0] = {"frames": [b"frame"]}
+    monkeypatch.setattr(app.glob, "glob", lambda *_: ["/dev/video0"])
+
+    assert app.discover_cameras()[0]["in_use"] is False
+    app.CAMERA_CONFIG = {**app.CAMERA_CONFIG, "cameras": [{"id": "cam0", "name": "One", "device": 0}]}
+    assert app.discover_cameras()[0]["in_use"] is True
+    assert opened_devices == [0]
+
+
+def test_discover_reprobes_after_config_change_and_failed_open(monkeypatch, device_registry, opened_devices):
+    monkeypatch.setattr(app.glob, "glob", lambda *_: ["/dev/video0", "/dev/video1"])
+    device_registry[0] = {"frames": [b"frame"]}
+    device_registry[1] = {"opened": False}
+
+    assert [dev["index"] for dev in app.discover_cameras()] == [0]
+
+    # A device that failed to open is probed again on the next discovery.
+    device_registry[1] = {"frames": [b"frame"]}
+    assert [dev["index"] for dev in app.discover_cameras()] == [0, 1]
+    assert sorted(opened_devices) == [0, 1, 1]
+
+    app.set_cameras(
+        app.CamerasUpdate(host="0.0.0.0", cameras=[{"id": "cam1", "name": "One", "device": 1}])
+    )
+    device_registry[0] = {"opened": False}
+    devices = app.discover_cameras()
+    assert [(dev["index"], dev["in_use"]) for dev in devices] == [(1, True)]
+    assert sorted(opened_devices) == [0, 0, 1, 1, 1]
+
+
 def test_snapshot_placeholder_when_no_frame(device_registry):
     device_registry[0] = {"frames": []}
     cam = app.Camera("cam0", 0)
@@ -62,6 +115,227 @@ def test_discover_preserves_zero_controls(monkeypatch, device_registry):
     }
 
 
+def test_frame_jpeg_encoded_once_per_frame(monkeypatch, device_registry, sample_frame):
+    calls = []
+
+    def counting_encode(frame, quality=80):  # noqa: ARG001
+        calls.append(quality)
+        return b"jpeg"
+
+    monkeypatch.setattr(app, "_encode_frame", counting_encode)
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camJ", 0)
+    try:
+        sample_frame.setflags(write=False)
+        cam.latest_frame = sample_frame
+        assert cam.get_frame_jpeg() == b"jpeg"
+        assert cam.get_frame_jpeg() == b"jpeg"
+        assert calls == [80]
+    finally:
+        cam.stop()
+
+
+def test_mjpeg_passthrough_skips_encode(monkeypatch, device_registry):
+    jpeg = np.frombuffer(b"\xff\xd8device-jpeg\xff\xd9", dtype=np.uint8).copy()
+    device_registry[0] = {"frames": [jpeg]}
+    monkeypatch.setattr(app, "_encode_frame", lambda *_args, **_kwargs: pytest.fail("re-encoded"))
+    cam = app.Camera("camP", 0, mjpeg_passthrough=True)
+    app.CAMERAS = {"camP": cam}
+
+    try:
+        assert cam.cap.properties[app.cv2.CAP_PROP_CONVERT_RGB] == 0
+        assert app.get_snapshot_bytes("camP") == jpeg.tobytes()
+        streamed = cam.get_frame_jpeg()
+        assert isinstance(streamed, memoryview)
+        assert streamed == jpeg.tobytes()
+    finally:
+        cam.stop()
+
+
+def test_encode_frame_uses_turbojpeg_without_simplejpeg(monkeypatch, sample_frame):
+    calls = []
+
+    class FakeTurboJPEG:
+        def encode(self, frame, quality, pixel_format, flags):
+            calls.append((frame, quality, pixel_format, flags))
+            return b"turbo"
+
+    monkeypatch.setattr(app, "simplejpeg", None)
+    monkeypatch.setattr(app, "_TURBOJPEG", FakeTurboJPEG())
+    monkeypatch.setattr(app, "TJPF_BGR", "bgr", raising=False)
+    monkeypatch.setattr(app, "TJFLAG_FASTDCT", "fastdct", raising=False)
+
+    assert app._encode_frame(sample_frame, quality=55) == b"turbo"
+    [(frame, quality, pixel_format, flags)] = calls
+    assert frame is sample_frame
+    assert quality == 55
+    assert pixel_format == "bgr"
+    assert flags == "fastdct"
+
+
+def _marker_encode(frame, quality=80):
+    # Deterministic stand-in for JPEG so the worker's view of the frame can be checked.
+    return bytes([quality]) + frame.tobytes()
+
+
+def test_encode_workers_round_trip_through_shared_memory(monkeypatch, device_registry):
+    monkeypatch.setattr(app, "ENCODE_WORKERS", 2)
+    monkeypatch.setattr(app, "_encode_frame", _marker_encode)
+    # Fork so the workers inherit the stubbed modules and the patched encoder.
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork"))
+    monkeypatch.setattr(app, "_ENCODE_POOL", pool)
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camW", 0)
+    app.CAMERAS = {"camW": cam}
+
+    try:
+        base = np.arange(8 * 6 * 3, dtype=np.uint8).reshape(8, 6, 3)
+        frames = [base + i for i in range(app.ENCODE_RING_SLOTS + 2)]
+        for quality, frame in enumerate(frames, start=50):
+            assert cam.encode(frame, quality=quality) == _marker_encode(frame, quality)
+
+        ring_name = cam._ring.name
+        assert cam._ring_slot_size == base.nbytes
+        assert cam._ring.size >= base.nbytes * app.ENCODE_RING_SLOTS
+        assert sorted(cam._ring_free) == list(range(app.ENCODE_RING_SLOTS))
+
+        # A different resolution does not fit the ring and is encoded in-process.
+        larger = np.ones((10, 10, 3), dtype=np.uint8)
+        assert cam.encode(larger, quality=70) == _marker_encode(larger, 70)
+        assert cam._ring.name == ring_name
+        assert cam._ring_slot_size == base.nbytes
+    finally:
+        app.shutdown_event()
+        pool.shutdown(wait=True)
+
+    assert app._ENCODE_POOL is None
+    assert cam._ring is None
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=ring_name)
+
+
+def test_release_ring_unlinks_segment_while_view_is_exported(device_registry):
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camR", 0)
+    app.CAMERAS = {"camR": cam}
+
+    ring = cam._shared_ring(16)
+    ring_name = ring.name
+    pinned = ring.buf[:16]
+    try:
+        # close() raises BufferError here; the segment must still be unlinked.
+        cam.stop()
+        assert cam._ring is None
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=ring_name)
+    finally:
+        pinned.release()
+        ring.close()
+
+
+def test_encode_falls_back_in_process_when_worker_fails(monkeypatch, device_registry, sample_frame):
+    failed = Future()
+    failed.set_exception(BrokenProcessPool("worker died"))
+    submitted = []
+
+    def submit(*args):
+        submitted.append(args)
+        return failed
+
+    monkeypatch.setattr(app, "ENCODE_WORKERS", 1)
+    monkeypatch.setattr(app, "_ENCODE_POOL", types.SimpleNamespace(submit=submit))
+    monkeypatch.setattr(app, "_encode_frame", _marker_encode)
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camX", 0)
+
+    try:
+        assert cam.encode(sample_frame, quality=60) == _marker_encode(sample_frame, 60)
+        assert len(submitted) == 1
+        # The slot handed to the failed worker is free again.
+        assert sorted(cam._ring_free) == list(range(app.ENCODE_RING_SLOTS))
+    finally:
+        cam.stop()
+    assert cam._ring is None
+
+
+class _FakePicamera2:
+    instances: list = []
+
+    def __init__(self, camera_num, fail_on=None):
+        self.camera_num = camera_num
+        self.fail_on = fail_on
+        self.calls = []
+        self.output = None
+        _FakePicamera2.instances.append(self)
+
+    def create_video_configuration(self, main, controls):
+        return {"main": main, "controls": controls}
+
+    def configure(self, config):
+        self.calls.append(("configure", config))
+        if self.fail_on == "configure":
+            raise RuntimeError("configure failed")
+
+    def start_recording(self, encoder, output):
+        self.calls.append(("start_recording", encoder))
+        if self.fail_on == "start_recording":
+            raise RuntimeError("Camera in use")
+        self.output = output
+
+    def stop_recording(self):
+        self.calls.append(("stop_recording",))
+
+    def close(self):
+        self.calls.append(("close",))
+
+
+def _fake_picamera2(monkeypatch, fail_on=None):
+    _FakePicamera2.instances = []
+    monkeypatch.setattr(app, "Picamera2", lambda num: _FakePicamera2(num, fail_on))
+    monkeypatch.setattr(app, "MJPEGEncoder", lambda: "mjpeg-encoder", raising=False)
+    monkeypatch.setattr(app, "FileOutput", lambda sink: types.SimpleNamespace(sink=sink), raising=False)
+
+
+def test_picamera_source_reads_newest_frame_and_releases(monkeypatch):
+    _fake_picamera2(monkeypatch)
+    source = app.PiCameraSource(1, width=640, height=480, fps=15)
+    picam = _FakePicamera2.instances[0]
+    assert picam.camera_num == 1
+    assert picam.calls[0] == ("configure", {"main": {"size": (640, 480)}, "controls": {"FrameRate": 15.0}})
+    assert picam.calls[1] == ("start_recording", "mjpeg-encoder")
+    assert source.isOpened()
+
+    sink = picam.output.sink
+    sink.write(b"\xff\xd8first")
+    ok, frame = source.read()
+    assert ok and frame.tobytes() == b"\xff\xd8first"
+
+    # Only the newest hardware frame is handed out once the reader falls behind.
+    sink.write(b"\xff\xd8second")
+    sink.write(b"\xff\xd8third")
+    ok, frame = source.read()
+    assert ok and frame.tobytes() == b"\xff\xd8third"
+
+    source.release()
+    assert not source.isOpened()
+    assert picam.calls[2:] == [("stop_recording",), ("close",)]
+    assert source.read() == (False, None)
+    source.release()
+    assert picam.calls[2:] == [("stop_recording",), ("close",)]
+
+
+@pytest.mark.parametrize("fail_on", ["configure", "start_recording"])
+def test_picamera_source_closes_camera_when_start_fails(monkeypatch, fail_on):
+    _fake_picamera2(monkeypatch, fail_on=fail_on)
+    cam = app.Camera("camPi", 0, source="picamera2")
+    try:
+        assert cam.cap is None
+        assert app.CAMERA_STATUS["camPi"]["state"] == "offline"
+        assert _FakePicamera2.instances[0].calls[-1] == ("close",)
+    finally:
+        cam.stop()
+
+
 def test_placeholder_uses_config_resolution(monkeypatch):
     shapes = []
 
@@ -99,6 +373,25 @@ def test_placeholder_uses_config_resolution(monkeypatch):
     assert shapes[-1] == (360, 640)
 
 
+def test_offline_placeholder_encoded_once_per_size(monkeypatch):
+    encoded = []
+
+    def counting_encode(frame, quality=80):
+        encoded.append((frame.shape[:2], quality))
+        return b"jpeg"
+
+    monkeypatch.setattr(app, "_encode_frame", counting_encode)
+
+    assert app._offline_placeholder("camx", 640, 360) == b"jpeg"
+    assert app._offline_placeholder("camx", 640, 360) == b"jpeg"
+    assert encoded == [((360, 640), 85)]
+
+    # The label carries the camera id, and other sizes need their own image.
+    app._offline_placeholder("camy", 640, 360)
+    app._offline_placeholder("camx", 320, 240)
+    assert encoded[1:] == [((360, 640), 85), ((240, 320), 85)]
+
+
 def test_placeholder_returned_for_missing_camera(monkeypatch):
     app.CAMERA_CONFIG = {
         "host": "0.0.0.0",
@@ -134,6 +427,19 @@ def test_health_summarises_status(monkeypatch):
     assert health["summary"]["online"] == 1
 
 
+def test_health_route_serializes_summary(client):
+    app.CAMERA_CONFIG = {
+        "host": "0.0.0.0",
+        "auth": app.default_config()["auth"],
+        "cameras": [{"id": "camA", "name": "One", "device": 0}],
+    }
+    res = client.get("/health")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/json"
+    assert res.json()["summary"] == {"total": 1, "online": 0, "stale": 0, "offline": 1}
+    assert res.json() == app.health()
+
+
 def test_metrics_plain_text(monkeypatch):
     app.CAMERA_CONFIG = {
         "host": "0.0.0.0",
@@ -147,6 +453,30 @@ def test_metrics_plain_text(monkeypatch):
     assert "rpicam_camera_online" in res.body.decode()
 
 
+def test_metrics_reused_until_status_changes(monkeypatch):
+    app.CAMERA_CONFIG = {
+        "host": "0.0.0.0",
+        "auth": app.default_config()["auth"],
+        "cameras": [{"id": "camM", "name": "One", "device": 0}],
+    }
+    builds = []
+    camera_statuses = app.camera_statuses
+
+    def counting_statuses():
+        builds.append(1)
+        return camera_statuses()
+
+    monkeypatch.setattr(app, "camera_statuses", counting_statuses)
+    app._set_status("camM", "offline", "not started", 0)
+    first = app.metrics().body
+    assert app.metrics().body == first
+    assert len(builds) == 1
+
+    app._set_status("camM", "online", "running", 0)
+    assert 'rpicam_camera_online{camera="camM"} 1' in app.metrics().body.decode()
+    assert len(builds) == 2
+
+
 def test_stream_auth_optional(client):
     app.CAMERA_CONFIG = {
         "host": "0.0.0.0",
@@ -167,6 +497,101 @@ def test_stream_auth_optional(client):
     assert res.status_code == 200
 
 
+def test_snapshot_etag_returns_not_modified(client, device_registry, sample_frame):
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camE", 0)
+    app.CAMERA_CONFIG = {
+        "host": "0.0.0.0",
+        "auth": app.default_config()["auth"],
+        "cameras": [{"id": "camE", "name": "One", "device": 0}],
+    }
+    app.CAMERAS = {"camE": cam}
+
+    try:
+        cam._publish_frame(sample_frame)
+        res = client.get("/cam/camE/snapshot")
+        assert res.status_code == 200
+        etag = res.headers["etag"]
+
+        res = client.get("/cam/camE/snapshot", headers={"If-None-Match": etag})
+        assert res.status_code == 304
+
+        cam._publish_frame(sample_frame.copy())
+        res = client.get("/cam/camE/snapshot", headers={"If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.headers["etag"] != etag
+    finally:
+        cam.stop()
+
+
+def test_snapshot_reuses_stored_file(monkeypatch, tmp_path, client, device_registry, sample_frame):
+    monkeypatch.setattr(app, "SNAPSHOT_DIR", str(tmp_path / "snaps"))
+    monkeypatch.setattr(app, "SNAPSHOT_FILE_GRACE", 0.0)
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camF", 0)
+    app.CAMERA_CONFIG = {
+        "host": "0.0.0.0",
+        "auth": app.default_config()["auth"],
+        "cameras": [{"id": "camF", "name": "One", "device": 0}],
+    }
+    app.CAMERAS = {"camF": cam}
+
+    try:
+        cam._publish_frame(sample_frame)
+        first = client.get("/cam/camF/snapshot")
+        assert first.status_code == 200
+
+        monkeypatch.setattr(app, "_encode_frame", lambda *_args, **_kwargs: pytest.fail("re-encoded"))
+        second = client.get("/cam/camF/snapshot")
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+    finally:
+        cam.stop()
+    cam._snapshot_cleanup.join()
+    assert not list((tmp_path / "snaps").glob("*.jpg"))
+
+
+def test_snapshot_files_match_etag_under_concurrent_stores(monkeypatch, tmp_path, device_registry):
+    monkeypatch.setattr(app, "SNAPSHOT_DIR", str(tmp_path / "snaps"))
+    device_registry[0] = {"opened": False}
+    cam = app.Camera("camC", 0)
+    etags = [f'"{cam.etag_prefix}-{seq}"' for seq in range(40)]
+    mismatches = []
+
+    def store(chunk):
+        for etag in chunk:
+            # Frames of different sizes so a mismatched stat would show up.
+            cam.store_snapshot(etag.encode() * (len(etag) % 7 + 1), etag)
+
+    def serve():
+        for _ in range(400):
+            for etag in etags:
+                stored = cam.snapshot_file(etag)
+                if stored is None:
+                    continue
+                path, stat_result = stored
+                try:
+                    data = path.read_bytes()
+                except FileNotFoundError:
+                    # Pruned by newer frames since the lookup; never rewritten.
+                    continue
+                if data != etag.encode() * (len(etag) % 7 + 1) or stat_result.st_size != len(data):
+                    mismatches.append((etag, data[:20]))
+
+    workers = [threading.Thread(target=store, args=(etags[i::4],)) for i in range(4)]
+    workers.append(threading.Thread(target=serve))
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert not mismatches
+        assert len(list((tmp_path / "snaps").glob("*.jpg"))) <= app.SNAPSHOT_FILES_KEPT
+    finally:
+        cam.stop()
+
+
 async def test_mjpeg_generator_tracks_subscribers(device_registry, sample_frame):
     device_registry[0] = {"frames": [sample_frame for _ in range(5)]}
     cam = app.Camera("cam0", 0)
@@ -183,6 +608,24 @@ async def test_mjpeg_generator_tracks_subscribers(device_registry, sample_frame)
     assert cam._subscriber_count() == 0
 
 
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_mjpeg_generator_keeps_slow_camera_live(monkeypatch, device_registry, sample_frame):
+    monkeypatch.setattr(app, "_encode_frame", lambda *_args, **_kwargs: b"live")
+    monkeypatch.setattr(app, "_offline_placeholder", lambda *_args, **_kwargs: b"offline")
+    device_registry[0] = {"frames": [sample_frame.copy() for _ in range(5)]}
+    # 0.8 fps: frames arrive every 1.25 s, past the old fixed 1 s stall timeout.
+    cam = app.Camera("camSlow", 0, fps=0.8)
+    app.CAMERAS = {"camSlow": cam}
+
+    try:
+        gen = app.mjpeg_generator("camSlow")
+        frames = await _collect_frames(gen, 2)
+        assert all(frame.endswith(b"live\r\n") for frame in frames)
+    finally:
+        await gen.aclose()
+        cam.stop()
+
+
 async def test_mjpeg_generator_uses_placeholder_when_offline(device_registry):
     device_registry[0] = {"opened": False}
     cam = app.Camera("camOffline", 0)